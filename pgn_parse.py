@@ -0,0 +1,234 @@
+"""
+Helpers shared by the hand-history scrapers for reading exported PGN files
+and writing one CSV row per hand.
+
+The files are small and have a fixed layout, so fields are located with
+bytes.find on the raw file contents rather than by walking lines.
+"""
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, suppress
+from pathlib import Path
+
+BIG_BLIND_PATTERN = re.compile(rb"Big Blind:\s*(\d+)")
+SMALL_BLIND_PATTERN = re.compile(rb"Small Blind:\s*(\d+)")
+ACTION_PATTERN = re.compile(rb"\((\d+),(\w+)(?:,(\d+))?\)")
+
+# Preflop action codes; the betting loop dispatches on these ints
+RAISE, CALL, CHECK, FOLD, OTHER = range(5)
+ACTION_CODES = {b"RAISE": RAISE, b"CALL": CALL, b"CHECK": CHECK, b"FOLD": FOLD}
+
+# Exported hand files: texas.pgn, texas(1).pgn, texas(2).pgn, ...
+PGN_NAME_PATTERN = re.compile(r"texas(?:\((\d+)\))?\.pgn")
+
+# Headers that can follow the PREFLOP section
+SECTION_HEADERS = (b"\nFLOP", b"\nTURN", b"\nRIVER", b"\nSETTLE")
+
+def extract_winner(line):
+    # Winners of the first pot, e.g. "Winners: (Pot 0,22,6269,[1])"
+    a = line.find("[")
+    b = line.find("]", a)
+    if a < 0 or b < 0:
+        return None
+    x = line[a + 1:b].strip()
+    if x == "":
+        return None
+    # Handle multiple winners (tie) - e.g. "[2, 0]"
+    winners = x.split(",")
+    if len(winners) > 1:
+        return None  # Tie - multiple winners
+    return int(winners[0])
+
+def extract_starting_chips(line):
+    # "Player Chips: 1000112,999939,999949"
+    i = line.find(":")
+    if i < 0:
+        return None
+    # int() ignores the surrounding whitespace itself, so no per-token strip
+    return list(map(int, line[i + 1:].split(",")))
+
+def extract_file_index(name):
+    # "texas.pgn" -> 0, "texas(12).pgn" -> 12, "texas(copy).pgn" / "texas_old.pgn" -> None
+    m = PGN_NAME_PATTERN.fullmatch(name)
+    if not m:
+        return None
+    return int(m.group(1)) if m.group(1) else 0
+
+def seat_columns(suffix, num_players):
+    # Rows are positional tuples, so names are built once in seat order
+    return [f"player{p}_{suffix}" for p in range(num_players)]
+
+def check_player_count(starting_chips, num_players, game_index):
+    """Raise if a hand does not fit a CSV laid out for num_players seats."""
+    if len(starting_chips) != num_players:
+        raise ValueError(
+            f"Hand {game_index} has {len(starting_chips)} players, "
+            f"expected {num_players}"
+        )
+
+def list_pgn_files(directory):
+    """
+    Return (file_index, path) for each exported hand in directory, ordered by
+    file_index. Anything else (texas_old.pgn, texas(copy).pgn) is skipped, and
+    the index comes from the name so a missing file leaves a gap instead of
+    shifting every later hand.
+    """
+    indexed = []
+    for e in os.scandir(directory):
+        index = extract_file_index(e.name)
+        if index is not None:
+            indexed.append((index, e.path))
+    indexed.sort(key=lambda item: item[0])
+    return indexed
+
+def line_at(data, start):
+    """Decode the line of data that begins at index start."""
+    end = data.find(b"\n", start)
+    return data[start:end if end >= 0 else len(data)].decode()
+
+def parse_pgn(path):
+    """
+    Scan a PGN file once, front to back, and return
+    (starting_chips, winner, big_blind, small_blind, preflop_actions).
+    """
+    starting_chips = None
+    winner = None
+    big_blind = None
+    small_blind = None
+    preflop_actions = []
+
+    # PGN files are tiny: read once and jump to each field with bytes.find
+    # instead of walking every line in Python
+    data = Path(path).read_bytes()
+
+    # PREHAND fields all sit before the PREFLOP header
+    start = data.find(b"\nPREFLOP")
+    prehand_end = start if start >= 0 else len(data)
+
+    i = data.find(b"Big Blind:", 0, prehand_end)
+    if i >= 0:
+        m = BIG_BLIND_PATTERN.match(data, i)
+        if m:
+            big_blind = int(m.group(1))
+    i = data.find(b"Small Blind:", 0, prehand_end)
+    if i >= 0:
+        m = SMALL_BLIND_PATTERN.match(data, i)
+        if m:
+            small_blind = int(m.group(1))
+    i = data.find(b"Player Chips:", 0, prehand_end)
+    if i >= 0:
+        starting_chips = extract_starting_chips(line_at(data, i))
+
+    # Scan actions like "1. (0,RAISE,6);(1,CALL)" over the PREFLOP section only
+    end = 0
+    if start >= 0:
+        ends = [j for j in (data.find(h, start) for h in SECTION_HEADERS) if j >= 0]
+        end = min(ends) if ends else len(data)
+        add_action = preflop_actions.append
+        code = ACTION_CODES.get
+        for m in ACTION_PATTERN.finditer(data, start, end):
+            total = m.group(3)
+            add_action(
+                (int(m.group(1)), code(m.group(2), OTHER), int(total) if total else None)
+            )
+
+    # SETTLE is last, so the winner search resumes where PREFLOP ended
+    i = data.find(b"Winners:", end)
+    if i >= 0:
+        winner = extract_winner(line_at(data, i))
+
+    return starting_chips, winner, big_blind, small_blind, preflop_actions
+
+def format_row(row):
+    """
+    Encode a row of ints / plain names as a CSV line. Nothing here ever needs
+    quoting, so csv.writer is skipped; None and "" become empty cells and the
+    line ends in CRLF like csv.writer's default.
+    """
+    return ",".join(["" if v is None else str(v) for v in row]).encode() + b"\r\n"
+
+@contextmanager
+def replace_on_success(path):
+    """
+    Open a buffered binary file that takes the place of path only once the
+    block finishes. If the block raises, the partial output is dropped and
+    whatever was at path before is left as it was.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb", buffering=1 << 20) as f:
+            yield f
+        # mkstemp creates the file 0600; give it the mode open() would have
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+def iter_hands(results, num_players):
+    """
+    Yield (game_index, winner, starting_chips, shift, *extra) for each parse
+    result (starting_chips, winner, *extra) that has chips. Seats rotate right
+    by shift each hand; rows apply it when indexing.
+    """
+    game_index = 0
+
+    for starting_chips, winner, *extra in results:
+        if starting_chips is None:
+            continue
+        check_player_count(starting_chips, num_players, game_index)
+
+        yield (game_index, winner, starting_chips, game_index % num_players, *extra)
+        game_index += 1
+
+def start_and_net(hand, next_hand, num_players):
+    """
+    Return the seat-ordered starting chips of hand and each seat's chip change
+    up to next_hand. The last hand (next_hand is None) has an empty net.
+    """
+    chips, shift = hand[2], hand[3]
+    n = num_players
+    start = [chips[(p - shift) % n] for p in range(n)]
+    if next_hand is None:
+        net = [""] * n
+    else:
+        next_chips, next_shift = next_hand[2], next_hand[3]
+        net = [next_chips[(p - next_shift) % n] - start[p] for p in range(n)]
+    return start, net
+
+def iter_rows(hands, hand_row):
+    """
+    Yield hand_row(hand, next_hand) for a stream of hands. A hand's net is the
+    chip change up to the next hand, so only two hands are held at a time; the
+    last hand is passed next_hand=None.
+    """
+    prev = next(hands, None)
+    if prev is None:
+        return
+
+    for hand in hands:
+        yield hand_row(prev, hand)
+        prev = hand
+
+    yield hand_row(prev, None)
+
+def write_hands_csv(directory, output, fieldnames, parse_file, hand_row, num_players):
+    """
+    Parse every exported hand in directory with parse_file in worker processes
+    and write fieldnames plus one hand_row per hand to output.
+    """
+    paths = [path for _, path in list_pgn_files(directory)]
+
+    # The old CSV is only replaced once every hand has been written
+    with ProcessPoolExecutor() as executor, replace_on_success(output) as f:
+        f.write(format_row(fieldnames))
+        # Files are independent; map keeps results in path order
+        results = executor.map(parse_file, paths, chunksize=32)
+        hands = iter_hands(results, num_players)
+        f.writelines(map(format_row, iter_rows(hands, hand_row)))
@@ -1,97 +1,23 @@
-import csv
-import glob
-import os
-import re
+from pgn_parse import parse_pgn, seat_columns, start_and_net, write_hands_csv
 
-WINNERS_PATTERN = re.compile(r"\[(.*?)\]")
-PLAYER_CHIPS_PATTERN = re.compile(r"Player Chips:\s*([0-9,\s]+)")
+NUM_PLAYERS = 3
 
-def extract_winner(line):
-    m = WINNERS_PATTERN.search(line)
-    if not m:
-        return None
-    x = m.group(1).strip()
-    if x == "":
-        return None
-    # Handle multiple winners (tie) - split by comma and strip spaces
-    winners = [int(w.strip()) for w in x.split(",")]
-    if len(winners) == 1:
-        return winners[0]
-    elif len(winners) > 1:
-        return None  # Tie - multiple winners
-    else:
-        return None
+FIELDNAMES = ["game_index", "winner",
+              *seat_columns("start", NUM_PLAYERS), *seat_columns("net", NUM_PLAYERS)]
 
-def extract_starting_chips(line):
-    m = PLAYER_CHIPS_PATTERN.search(line)
-    if not m:
-        return None
-    return [int(x) for x in m.group(1).split(",")]
+def parse_file(path):
+    """Return (starting_chips, winner) for a single PGN file."""
+    starting_chips, winner, *_ = parse_pgn(path)
+    return starting_chips, winner
 
-def extract_file_index(name):
-    base = os.path.basename(name)
-    m = re.match(r"texas(?:\((\d+)\))?\.pgn$", base)
-    return int(m.group(1)) if m and m.group(1) else 0
-
-def rotate_right(chips, shift):
-    shift %= len(chips)
-    return chips[-shift:] + chips[:-shift]
+def hand_row(hand, next_hand):
+    g, w = hand[0], hand[1]
+    start, net = start_and_net(hand, next_hand, NUM_PLAYERS)
+    return (g, w, *start, *net)
 
 def main():
-    paths = sorted(glob.glob("hand_history/test1.1/texas*.pgn"), key=extract_file_index)
-    hands = []
-    game_index = 0
-
-    for path in paths:
-        starting_chips = None
-        winner = None
-
-        with open(path) as f:
-            for line in f:
-                s = line.strip()
-                if starting_chips is None and s.startswith("Player Chips:"):
-                    starting_chips = extract_starting_chips(s)
-                if s.startswith("Winners:"):
-                    winner = extract_winner(s)
-
-        if starting_chips is None:
-            continue
-
-        r = rotate_right(starting_chips, game_index % 3)
-
-        hands.append((game_index, winner, r))
-        game_index += 1
-
-    rows = []
-
-    for i, (g, w, chips) in enumerate(hands):
-        if i < len(hands) - 1:
-            next_chips = hands[i+1][2]
-            net0 = next_chips[0] - chips[0]
-            net1 = next_chips[1] - chips[1]
-            net2 = next_chips[2] - chips[2]
-        else:
-            net0 = net1 = net2 = ""
-
-        rows.append({
-            "game_index": g,
-            "winner": w,
-            "player0_start": chips[0],
-            "player1_start": chips[1],
-            "player2_start": chips[2],
-            "player0_net": net0,
-            "player1_net": net1,
-            "player2_net": net2,
-        })
-
-    with open("test1_1.csv", "w", newline="") as f:
-        writer = csv.DictWriter(
-            f,
-            ["game_index","winner","player0_start","player1_start","player2_start",
-             "player0_net","player1_net","player2_net"]
-        )
-        writer.writeheader()
-        writer.writerows(rows)
+    write_hands_csv("hand_history/test1.1", "test1_1.csv", FIELDNAMES,
+                    parse_file, hand_row, NUM_PLAYERS)
 
 if __name__ == "__main__":
     main()
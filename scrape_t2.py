@@ -1,33 +1,82 @@
 import csv
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from pgn_parse import list_pgn_files
+from texasholdem.game.action_type import ActionType
 from texasholdem.game.history import History
 from texasholdem.game.game import TexasHoldEm
 
 def get_pgn_files(directory):
-    """Get all PGN files in order: texas.pgn, texas(1).pgn, texas(2).pgn, ..."""
-    pgn_files = []
-    base_path = Path(directory)
-    
-    # First add texas.pgn
-    first_file = base_path / "texas.pgn"
-    if first_file.exists():
-        pgn_files.append(first_file)
-    
-    # Then add numbered files
-    i = 1
-    while True:
-        numbered_file = base_path / f"texas({i}).pgn"
-        if numbered_file.exists():
-            pgn_files.append(numbered_file)
-            i += 1
-        else:
-            break
-    
-    return pgn_files
+    """Get (game_index, path) for all PGN files in order: texas.pgn, texas(1).pgn, ...
+
+    The game index is the number in the file name, so the agent seating of a
+    hand stays right even when an earlier file is missing.
+    """
+    # One directory scan instead of an exists() probe per candidate name
+    return [(index, Path(path)) for index, path in list_pgn_files(directory)]
+
+def settle_chip_deltas(history):
+    """Net chip change per player, read off the betting and the settle pots.
+
+    Returns None when the history cannot be settled this way (no settle phase,
+    a busted player shifting the blinds, or a pot total that does not add up);
+    the caller then falls back to replaying the hand.
+    """
+    settle = history.settle
+    stacks = history.prehand.player_chips
+    num_players = len(stacks)
+    if not settle or not settle.pot_winners or 0 in stacks.values():
+        return None
+
+    # Replay only the chip movements: the button is seat 0, blinds follow it
+    # (heads-up the button posts the small blind)
+    sb_loc, bb_loc = (0, 1) if num_players == 2 else (1, 2)
+    contributed = [0] * num_players
+    for bet_round in (history.preflop, history.flop, history.turn, history.river):
+        if not bet_round:
+            continue
+        bets = [0] * num_players
+        if bet_round is history.preflop:
+            bets[sb_loc] = min(history.prehand.small_blind, stacks[sb_loc])
+            bets[bb_loc] = min(history.prehand.big_blind, stacks[bb_loc])
+        level = max(bets)
+        for action in bet_round.actions:
+            pid = action.player_id
+            left = stacks[pid] - contributed[pid] - bets[pid]
+            if action.action_type == ActionType.RAISE:
+                bets[pid] = action.total
+            elif action.action_type == ActionType.CALL:
+                bets[pid] += min(level - bets[pid], left)
+            elif action.action_type == ActionType.ALL_IN:
+                bets[pid] += left
+            level = max(level, bets[pid])
+        for pid, amount in enumerate(bets):
+            contributed[pid] += amount
+
+    deltas = [-amount for amount in contributed]
+    pot_total = 0
+    for amount, _, winners in settle.pot_winners.values():
+        pot_total += amount
+        win_amount = amount // len(winners)
+        for pid in winners:
+            deltas[pid] += win_amount
+        # leftover chip goes to the first winner left of the button
+        leftover = amount - win_amount * len(winners)
+        if leftover:
+            first = min(winners, key=lambda pid: (pid - 1) % num_players)
+            deltas[first] += leftover
+
+    if pot_total != sum(contributed):
+        return None
+    return deltas
 
 def parse_pgn_file(pgn_path, game_index):
-    """Parse a PGN file and return game results mapped to agents."""
+    """Parse a PGN file and return its CSV row, mapped to agents.
+
+    The row is (game_index, winner, claude_start, openai_start, claude_net, openai_net).
+    """
     # Import history
     history = History.import_history(pgn_path)
     
@@ -36,22 +85,26 @@ def parse_pgn_file(pgn_path, game_index):
     player0_start = starting_chips[0]
     player1_start = starting_chips[1]
     
-    # Replay the hand to get final chip counts
-    game_iterator = TexasHoldEm._import_history(history)
-    final_game = None
-    for game_state in game_iterator:
-        final_game = game_state
-    
-    if final_game is None:
-        raise ValueError(f"Could not replay hand from {pgn_path}")
-    
-    # Get final chips
-    player0_final = final_game.players[0].chips
-    player1_final = final_game.players[1].chips
+    # The settle pots already say who won what; only replay the hand when
+    # they cannot be reconciled with the betting
+    deltas = settle_chip_deltas(history)
+    if deltas is None:
+        # A maxlen=1 deque drains the generator in C and keeps only the last state
+        game_iterator = TexasHoldEm._import_history(history)
+        last_state = deque(game_iterator, maxlen=1)
+        
+        if not last_state:
+            raise ValueError(f"Could not replay hand from {pgn_path}")
+        final_game = last_state[0]
+        
+        deltas = [
+            final_game.players[0].chips - player0_start,
+            final_game.players[1].chips - player1_start,
+        ]
     
     # Calculate net gains for players
-    player0_net = player0_final - player0_start
-    player1_net = player1_final - player1_start
+    player0_net = deltas[0]
+    player1_net = deltas[1]
     
     # Determine which agent is which based on hand index (matching test2.py logic)
     # hand_index % 2 == 0: agent0 = claude, agent1 = openai
@@ -73,7 +126,7 @@ def parse_pgn_file(pgn_path, game_index):
     settle = history.settle
     if settle and settle.pot_winners:
         # Get the first pot's winners (usually only one pot in heads-up)
-        pot_data = list(settle.pot_winners.values())[0]
+        pot_data = next(iter(settle.pot_winners.values()))
         winners = pot_data[2]  # List of winner player IDs
         if len(winners) == 1:
             winner_player = winners[0]
@@ -91,13 +144,20 @@ def parse_pgn_file(pgn_path, game_index):
     else:
         winner_agent = 'tie'
     
-    return {
-        'winner': winner_agent,
-        'claude_start': claude_start,
-        'openai_start': openai_start,
-        'claude_net': claude_net,
-        'openai_net': openai_net,
-    }
+    return (game_index, winner_agent, claude_start, openai_start, claude_net, openai_net)
+
+def parse_pgn_file_indexed(item):
+    """Process-pool worker: parse one (game_index, pgn_path) pair.
+
+    Errors are returned as text rather than raised so one bad file does not
+    abort the whole batch.
+    """
+    game_index, pgn_path = item
+    try:
+        row = parse_pgn_file(pgn_path, game_index)
+    except Exception as e:
+        return pgn_path, None, str(e)
+    return pgn_path, row, None
 
 def main():
     pgn_directory = './hand_history/test3.tight'
@@ -107,29 +167,28 @@ def main():
     pgn_files = get_pgn_files(pgn_directory)
     print(f"Found {len(pgn_files)} PGN files")
     
-    # Parse each file and collect results
-    results = []
-    for game_index, pgn_path in enumerate(pgn_files):
-        try:
-            result = parse_pgn_file(pgn_path, game_index)
-            result['game_index'] = game_index
-            results.append(result)
-            print(f"Parsed {pgn_path.name}: Winner={result['winner']}, "
-                  f"Claude_net={result['claude_net']}, OpenAI_net={result['openai_net']}")
-        except Exception as e:
-            print(f"Error parsing {pgn_path.name}: {e}")
-            continue
-    
-    # Write to CSV
-    with open(output_file, 'w', newline='') as csvfile:
+    # Parse the files in parallel; map yields results in file order, and
+    # each row is written as soon as it arrives instead of being buffered
+    saved = 0
+    with ProcessPoolExecutor() as executor, open(output_file, 'w', newline='') as csvfile:
         fieldnames = ['game_index', 'winner', 'claude_start', 'openai_start', 
                      'claude_net', 'openai_net']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for result in results:
-            writer.writerow(result)
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+
+        for pgn_path, row, error in executor.map(
+            parse_pgn_file_indexed, pgn_files, chunksize=16
+        ):
+            if error is not None:
+                print(f"Error parsing {pgn_path.name}: {error}")
+                continue
+            writer.writerow(row)
+            saved += 1
+            _, winner, _, _, claude_net, openai_net = row
+            print(f"Parsed {pgn_path.name}: Winner={winner}, "
+                  f"Claude_net={claude_net}, OpenAI_net={openai_net}")
     
-    print(f"\nSaved {len(results)} results to {output_file}")
+    print(f"\nSaved {saved} results to {output_file}")
 
 if __name__ == '__main__':
     main()
@@ -1,12 +1,14 @@
+import asyncio
+
 from texasholdem import TexasHoldEm
-from texasholdem.gui.text_gui import TextGUI
 from texasholdem.agents import openai_agent, claude_agent
 
-hand_index = 0
+# Hands played at once. Each hand spends its time waiting on LLM round-trips,
+# so running several side by side overlaps that latency.
+BATCH_SIZE = 8
 
-while True:
+async def play_hand(hand_index):
     game = TexasHoldEm(buyin=10000, big_blind=2, small_blind=1, max_players=2)
-    gui = TextGUI(game=game)
 
     if hand_index % 2 == 0:
         agent0 = claude_agent
@@ -17,10 +19,28 @@ while True:
 
     game.start_hand()
     while game.is_hand_running():
-        if game.current_player == 0:
-            game.take_action(*agent0(game))
-        else:
-            game.take_action(*agent1(game))
+        agent = agent0 if game.current_player == 0 else agent1
+        # The agents block on HTTPS; run them off the event loop
+        game.take_action(*await asyncio.to_thread(agent, game))
+
+    return game
+
+async def main():
+    hand_index = 0
+
+    while True:
+        games = await asyncio.gather(
+            *(play_hand(hand_index + i) for i in range(BATCH_SIZE)),
+            return_exceptions=True,
+        )
+
+        # Export in hand order so texas(n).pgn keeps lining up with hand_index,
+        # which scrape_t2.py relies on to tell the agents apart. A failed hand
+        # stops the run, but the hands before it are still saved.
+        for game in games:
+            if isinstance(game, BaseException):
+                raise game
+            game.export_history('./hand_history/test3.tight_aware/texas.pgn')
+        hand_index += BATCH_SIZE
 
-    path = game.export_history('./hand_history/test3.tight_aware/texas.pgn')
-    hand_index += 1
+asyncio.run(main())
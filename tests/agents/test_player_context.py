@@ -0,0 +1,71 @@
+"""Tests for the player context handed to the agents
+
+Includes:
+    - Forced moves are answered without a decision-maker
+    - Real decisions are left to the decision-maker
+"""
+import dataclasses
+
+from texasholdem.game.action_type import ActionType
+from texasholdem.agents.player_context import create_player_context, _trivial_action
+
+
+def test_trivial_action_real_choice(texas_game):
+    """
+    Calling, folding and raising preflop, and checking or raising on the big
+    blind option, are real decisions.
+
+    """
+    texas = texas_game(max_players=2)
+    texas.start_hand()
+
+    context = create_player_context(texas)
+    assert set(context.available_actions) == {
+        ActionType.CALL,
+        ActionType.FOLD,
+        ActionType.RAISE,
+    }
+    assert _trivial_action(context) is None
+
+    texas.take_action(ActionType.CALL)
+
+    context = create_player_context(texas)
+    assert set(context.available_actions) == {
+        ActionType.CHECK,
+        ActionType.FOLD,
+        ActionType.RAISE,
+    }
+    assert _trivial_action(context) is None
+
+
+def test_trivial_action_free_check(texas_game):
+    """
+    With raising closed (WSOP Rule 96), a free check is the only sensible move.
+
+    """
+    texas = texas_game(max_players=2)
+    texas.start_hand()
+    texas.take_action(ActionType.CALL)
+
+    # big blind option with the raise taken away
+    texas.raise_option = False
+
+    context = create_player_context(texas)
+    assert set(context.available_actions) == {ActionType.CHECK, ActionType.FOLD}
+    assert _trivial_action(context) == (ActionType.CHECK, None)
+
+
+def test_trivial_action_single_action(texas_game):
+    """
+    A lone non-raise action is taken as is; a lone raise still needs a total.
+
+    """
+    texas = texas_game(max_players=2)
+    texas.start_hand()
+    context = create_player_context(texas)
+
+    call_only = dataclasses.replace(context, available_actions=[ActionType.CALL])
+    assert _trivial_action(call_only) == (ActionType.CALL, None)
+
+    raise_only = dataclasses.replace(context, available_actions=[ActionType.RAISE])
+    assert _trivial_action(raise_only) is None
@@ -0,0 +1,179 @@
+"""Tests for the PGN helpers shared by the scrape scripts.
+
+Includes:
+    - Which exported file names are listed, and in what order
+    - Parsing a hand with and without a PREFLOP section, with LF or CRLF endings
+    - Rotating seats and computing each hand's net from the next hand
+    - Formatting CSV rows
+    - Replacing an output file only when writing it succeeds
+"""
+import os
+
+import pytest
+
+from pgn_parse import (
+    CALL,
+    FOLD,
+    RAISE,
+    format_row,
+    iter_hands,
+    iter_rows,
+    list_pgn_files,
+    parse_pgn,
+    replace_on_success,
+    start_and_net,
+)
+
+
+HAND = """PREHAND
+Big Blind: 5
+Small Blind: 2
+Player Chips: 100,900,500
+Player Cards: [Jc 7h],[3h 8d],[2c 2d]
+
+PREFLOP
+New Cards: []
+1. (0,RAISE,20);(1,CALL);(2,FOLD)
+
+FLOP
+New Cards: [Ah,Kd,2s]
+1. (0,RAISE,40);(1,FOLD)
+
+SETTLE
+New Cards: []
+Winners: (Pot 0,-1,67,[0])
+"""
+
+BLINDS_ONLY_HAND = """PREHAND
+Big Blind: 5
+Small Blind: 2
+Player Chips: 1,1499
+Player Cards: [6s Js],[Qh 9d]
+
+SETTLE
+New Cards: [7d,Jd,Td,6c,Ah]
+Winners: (Pot 0,2,2875,[0]);(Pot 1,4,-1,[1])
+"""
+
+
+def test_list_pgn_files(tmpdir):
+    """
+    Only texas.pgn and texas(N).pgn are listed, ordered by and paired with N;
+    anything else in the directory is skipped rather than shifting the index.
+
+    """
+    names = [
+        "texas(10).pgn",
+        "texas(2).pgn",
+        "texas.pgn",
+        "texas(1).pgn",
+        "texas_old.pgn",
+        "texas(copy).pgn",
+        "texas(1.pgn",
+        "texas(3).txt",
+        "notes.pgn",
+    ]
+    for name in names:
+        (tmpdir / name).write("")
+
+    listed = [
+        (index, os.path.basename(path)) for index, path in list_pgn_files(str(tmpdir))
+    ]
+    assert listed == [
+        (0, "texas.pgn"),
+        (1, "texas(1).pgn"),
+        (2, "texas(2).pgn"),
+        (10, "texas(10).pgn"),
+    ]
+
+
+@pytest.mark.parametrize("newline", ("\n", "\r\n"))
+def test_parse_pgn(tmpdir, newline):
+    """
+    Reads the prehand fields, the PREFLOP actions only and the first pot's winner.
+
+    """
+    path = tmpdir / "texas.pgn"
+    path.write_binary(HAND.replace("\n", newline).encode())
+
+    starting_chips, winner, big_blind, small_blind, preflop_actions = parse_pgn(
+        str(path)
+    )
+    assert starting_chips == [100, 900, 500]
+    assert winner == 0
+    assert (big_blind, small_blind) == (5, 2)
+    assert preflop_actions == [(0, RAISE, 20), (1, CALL, None), (2, FOLD, None)]
+
+
+@pytest.mark.parametrize("newline", ("\n", "\r\n"))
+def test_parse_pgn_no_preflop(tmpdir, newline):
+    """
+    A hand settled by the blinds alone has no PREFLOP section; the winner is
+    still read from SETTLE and there are no actions.
+
+    """
+    path = tmpdir / "texas.pgn"
+    path.write_binary(BLINDS_ONLY_HAND.replace("\n", newline).encode())
+
+    starting_chips, winner, big_blind, small_blind, preflop_actions = parse_pgn(
+        str(path)
+    )
+    assert starting_chips == [1, 1499]
+    assert winner == 0
+    assert (big_blind, small_blind) == (5, 2)
+    assert not preflop_actions
+
+
+def test_iter_rows_start_and_net():
+    """
+    Hands without chips are skipped, seats rotate by one each hand, a hand's net
+    is the change up to the next hand and the last hand has no net.
+
+    """
+    results = [
+        ([100, 200, 300], 0),
+        (None, None),
+        ([90, 110, 400], 1),
+        ([500, 50, 50], 2),
+    ]
+
+    def hand_row(hand, next_hand):
+        return (hand[0], hand[1], *start_and_net(hand, next_hand, 3))
+
+    rows = list(iter_rows(iter_hands(iter(results), 3), hand_row))
+    assert rows == [
+        (0, 0, [100, 200, 300], [300, -110, -190]),
+        (1, 1, [400, 90, 110], [-350, -40, 390]),
+        (2, 2, [50, 50, 500], ["", "", ""]),
+    ]
+
+
+def test_format_row():
+    """
+    None and "" become empty cells and rows end in CRLF like csv.writer.
+
+    """
+    assert format_row((0, None, 10, -5, "")) == b"0,,10,-5,\r\n"
+    assert format_row(["game_index", "winner"]) == b"game_index,winner\r\n"
+
+
+def test_replace_on_success(tmpdir):
+    """
+    The target is replaced once the block finishes; an error inside the block
+    leaves the previous file untouched and no temporary file behind.
+
+    """
+    target = tmpdir / "out.csv"
+    target.write_binary(b"old\r\n")
+
+    with pytest.raises(ValueError):
+        with replace_on_success(str(target)) as file:
+            file.write(b"partial\r\n")
+            raise ValueError("bad hand")
+    assert target.read_binary() == b"old\r\n"
+    assert tmpdir.listdir() == [target]
+
+    with replace_on_success(str(target)) as file:
+        file.write(b"new\r\n")
+    assert target.read_binary() == b"new\r\n"
+    assert tmpdir.listdir() == [target]
@@ -0,0 +1,105 @@
+"""Tests for the chip deltas scrape_t2.py reads off the settle phase.
+
+Includes:
+    - Agreement with a full replay on the good history files
+    - Agreement with a full replay on randomly played hands
+    - Agent labels following the file number when a file is missing
+"""
+import glob
+import random
+import shutil
+from collections import deque
+
+import pytest
+
+from texasholdem.game.game import TexasHoldEm
+from texasholdem.game.history import History, HistoryImportError
+from texasholdem.game.action_type import ActionType
+from texasholdem.agents.basic import random_agent
+
+from scrape_t2 import get_pgn_files, parse_pgn_file_indexed, settle_chip_deltas
+from tests.conftest import GOOD_GAME_HISTORY_DIRECTORY
+
+
+def replay_chip_deltas(history: History):
+    """The chip change of each player after replaying the hand in the engine"""
+    # pylint: disable=protected-access
+    game = deque(TexasHoldEm._import_history(history), maxlen=1)[0]
+    starting_chips = history.prehand.player_chips
+    return [
+        game.players[i].chips - starting_chips[i] for i in range(len(starting_chips))
+    ]
+
+
+@pytest.mark.parametrize("pgn", glob.glob(str(GOOD_GAME_HISTORY_DIRECTORY / "*")))
+def test_settle_deltas_match_replay(pgn):
+    """
+    The settle shortcut must agree with the engine on every good history file.
+
+    """
+    history = History.import_history(pgn)
+    deltas = settle_chip_deltas(history)
+    assert deltas is not None
+    assert deltas == replay_chip_deltas(history)
+
+
+@pytest.mark.parametrize("num_players", (2, 3, 6, 9))
+def test_settle_deltas_match_replay_random(tmpdir, num_players):
+    """
+    Plays random hands, exports them and checks the settle shortcut against
+    a replay of each exported history.
+
+    """
+    random.seed(num_players)
+    texas = TexasHoldEm(buyin=500, big_blind=5, small_blind=2, max_players=num_players)
+
+    checked = 0
+    while texas.is_game_running() and checked < 20:
+        texas.start_hand()
+        while texas.is_hand_running():
+            texas.take_action(*random_agent(texas))
+
+        # hands decided by the blinds alone export without a PREFLOP section,
+        # which the engine cannot import back
+        try:
+            history = History.import_history(texas.export_history(tmpdir / "texas.pgn"))
+        except HistoryImportError:
+            continue
+        deltas = settle_chip_deltas(history)
+
+        # a busted player shifts the blinds; the shortcut hands those to the replay
+        if deltas is not None:
+            assert deltas == replay_chip_deltas(history)
+            checked += 1
+
+    assert checked > 0
+
+
+def test_game_index_follows_file_name(tmpdir):
+    """
+    The seating alternates by the number in the file name, so a gap in the
+    numbering (no texas(2).pgn) must not swap the agents of later hands.
+
+    """
+    texas = TexasHoldEm(buyin=500, big_blind=5, small_blind=2, max_players=2)
+    texas.start_hand()
+    texas.take_action(ActionType.FOLD)
+    pgn = texas.export_history(tmpdir / "texas.pgn")
+
+    hand_dir = tmpdir / "hands"
+    hand_dir.mkdir()
+    for name in ("texas.pgn", "texas(1).pgn", "texas(3).pgn"):
+        shutil.copy(pgn, hand_dir / name)
+
+    rows = []
+    for item in get_pgn_files(str(hand_dir)):
+        _, row, error = parse_pgn_file_indexed(item)
+        assert error is None
+        rows.append(row)
+
+    # player 0 folds the small blind to player 1
+    assert rows == [
+        (0, "openai", 500, 500, -2, 2),
+        (1, "claude", 500, 500, 2, -2),
+        (3, "claude", 500, 500, 2, -2),
+    ]
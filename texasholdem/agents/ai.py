@@ -3,19 +3,249 @@ AI agents are included in this module:
     - :func:`openai_agent`
 """
 
+import functools
 import json
 import os
-from typing import Tuple, Optional
+from typing import TYPE_CHECKING, Literal, Tuple, Optional
 from dotenv import load_dotenv
-load_dotenv()
 
 from texasholdem.game.game import TexasHoldEm
 from texasholdem.game.action_type import ActionType
 from texasholdem.game.player_state import PlayerState
-from texasholdem.agents.player_context import create_player_context
-from openai import OpenAI
-import google.generativeai as genai
-from anthropic import Anthropic
+from texasholdem.agents.player_context import (
+    PlayerContext,
+    create_player_context,
+    _trivial_action,
+)
+from pydantic import BaseModel, Field
+
+# The provider SDKs are slow to import, so each is only imported once its agent runs
+if TYPE_CHECKING:
+    from openai import OpenAI
+    import google.generativeai as genai
+    from anthropic import Anthropic
+
+# Compact separators: indentation roughly doubles the prompt size for the model
+_COMPACT_JSON = (",", ":")
+
+
+# Response schema for providers with structured outputs, so the server enforces
+# the {action, total} shape instead of the agent re-parsing JSON. The schema
+# (field descriptions included) is sent to the model, so it carries no class
+# docstring. total has no default: Gemini's schema conversion rejects defaults.
+class PokerAction(BaseModel):  # pylint: disable=missing-class-docstring
+    action: Literal["FOLD", "CHECK", "CALL", "RAISE"]
+    total: Optional[int] = Field(
+        description="The total amount to raise to; null unless action is RAISE"
+    )
+
+
+# Prompt templates, filled in with str.format on each turn
+_TIGHT_PROMPT = """You are playing Texas Hold'em poker. Here is the current game state:
+
+  {context_json}
+
+  You must choose one of the available actions: {available_actions}.
+
+  Rules:
+  - If you choose RAISE, you must provide a "total" amount (the total amount to raise to)
+  {raise_range_info}
+  - For other actions (CALL, CHECK, FOLD), do not provide a total value (set it to null)
+  - You have {chips} chips
+  - You need to call {chips_to_call} chips to stay in
+  - The pot is {total_pot_size} chips
+
+  Respond with a JSON object in this exact format:
+  {{"action":"ACTION_NAME","total":null}}
+
+  For RAISE actions, use:
+  {{"action":"RAISE","total":<number>}}
+
+  For other actions, use:
+  {{"action":"ACTION_NAME","total":null}}
+
+  Make a good decision as a tight player (playing against a tight player) based on the game situation."""
+
+_GEMINI_PROMPT = """You are playing Texas Hold'em poker. Here is the current game state:
+
+  {context_json}
+
+  You must choose one of the available actions: {available_actions}.
+
+  Rules:
+  - If you choose RAISE, you must provide a "total" amount (the total amount to raise to)
+  {raise_range_info}
+  - For CALL, CHECK, or FOLD, set total=null
+  - You have {chips} chips
+  - You need to call {chips_to_call} chips
+  - The pot is {total_pot_size} chips
+
+  Respond ONLY with a JSON object:
+  {{"action":"ACTION_NAME","total":null}}
+  or if raising:
+  {{"action":"RAISE","total":<number>}}
+
+  Choose the best action based on your hand, the board, pot odds, and game situation.
+  """
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_env() -> None:
+    """Loads :code:`.env` into the environment the first time an agent needs a key."""
+    load_dotenv()
+
+
+# SDK clients hold connection pools; build one per key and reuse it across turns
+@functools.lru_cache(maxsize=4)
+def _openai_client(api_key: str) -> "OpenAI":
+    """Returns a cached OpenAI client for the given key."""
+    from openai import OpenAI  # pylint: disable=import-outside-toplevel
+
+    return OpenAI(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=4)
+def _gemini_model(api_key: str, model: str) -> "genai.GenerativeModel":
+    """
+    Returns a cached Gemini model. :code:`genai.configure` is process-wide, so it
+    is only called when a new (api_key, model) pair is first seen.
+    """
+    import google.generativeai as genai  # pylint: disable=import-outside-toplevel
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model)
+
+
+@functools.lru_cache(maxsize=4)
+def _anthropic_client(api_key: str) -> "Anthropic":
+    """Returns a cached Anthropic client for the given key."""
+    from anthropic import Anthropic  # pylint: disable=import-outside-toplevel
+
+    return Anthropic(api_key=api_key)
+
+
+_TIGHT_SYSTEM = (
+    "You are a tight poker player making decisions in Texas Hold'em. "
+    "Your opponent is a tight player. Always respond with valid JSON "
+    "containing 'action' and 'total' fields."
+)
+
+
+def _get_api_key(api_key: Optional[str], env_var: str, provider: str) -> str:
+    """Returns :code:`api_key`, falling back to :code:`env_var` (and .env)."""
+    if api_key is None:
+        _ensure_env()
+        api_key = os.getenv(env_var)
+        if api_key is None:
+            raise ValueError(
+                f"{provider} API key not provided. Either pass api_key argument "
+                f"or set {env_var} environment variable."
+            )
+    return api_key
+
+
+def _build_prompt(context: PlayerContext, template: str) -> str:
+    """Fills in a prompt template from the player context."""
+    context_dict = context.to_dict()
+
+    if context_dict["raise_range"]:
+        raise_range_info = (
+            f"- The raise total must be between "
+            f"{context_dict['raise_range']['min']} and {context_dict['raise_range']['max']}"
+        )
+    else:
+        raise_range_info = "- RAISE is not available in this situation"
+
+    return template.format(
+        context_json=json.dumps(context_dict, separators=_COMPACT_JSON),
+        available_actions=", ".join(context_dict["available_actions"]),
+        raise_range_info=raise_range_info,
+        chips=context_dict["chips"],
+        chips_to_call=context_dict["chips_to_call"],
+        total_pot_size=context_dict["total_pot_size"],
+    )
+
+
+def _build_context_and_prompt(
+    game: TexasHoldEm,
+    template: str,
+    api_key: Optional[str],
+    env_var: str,
+    provider: str,
+) -> Tuple[
+    PlayerContext,
+    Optional[Tuple[ActionType, Optional[int]]],
+    Optional[str],
+    Optional[str],
+]:
+    """
+    Returns :code:`(context, trivial, prompt, api_key)` for the current player.
+    :code:`trivial` is the forced move, if there is one, in which case
+    :code:`prompt` and :code:`api_key` are None.
+    """
+    # Forced moves don't need a round-trip to the model, or an API key
+    context = create_player_context(game)
+    trivial = _trivial_action(context)
+    if trivial is not None:
+        return context, trivial, None, None
+
+    api_key = _get_api_key(api_key, env_var, provider)
+    return context, None, _build_prompt(context, template), api_key
+
+
+def _validate_action(
+    context: PlayerContext, action_str: str, total: Optional[int], provider: str
+) -> Tuple[ActionType, Optional[int]]:
+    """
+    Checks a model's action against the context.
+
+    Raises:
+        ValueError: If the action is unknown, unavailable, or an invalid raise
+    """
+    try:
+        action = ActionType[action_str]
+    except KeyError:
+        raise ValueError(
+            f"Invalid action '{action_str}' from {provider}. "
+            f"Valid actions: {list(context.available_action_names)}"
+        )
+
+    if action not in context.available_actions:
+        raise ValueError(
+            f"Action '{action_str}' is not available. "
+            f"Available actions: {list(context.available_action_names)}"
+        )
+
+    # Only raises carry a total
+    if action != ActionType.RAISE:
+        return action, None
+
+    if total is None:
+        raise ValueError("RAISE action requires a 'total' value")
+    if context.raise_range and total not in context.raise_range:
+        raise ValueError(
+            f"Raise total {total} is out of range. "
+            f"Valid range: {context.raise_range.start} to {context.raise_range.stop - 1}"
+        )
+    return action, total
+
+
+def _parse_and_validate(
+    response_text: str, context: PlayerContext, provider: str
+) -> Tuple[ActionType, Optional[int]]:
+    """
+    Parses a JSON :code:`{"action": ..., "total": ...}` response and validates it.
+
+    Raises:
+        ValueError: If the response is not JSON or the action is invalid
+    """
+    try:
+        response_json = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse {provider} response as JSON: {e}")
+
+    action_str = response_json.get("action", "").upper()
+    return _validate_action(context, action_str, response_json.get("total"), provider)
 
 
 def openai_agent(
@@ -49,112 +279,34 @@ def openai_agent(
           >>> game.start_hand()
           >>> action, total = openai_agent(game, api_key="your-api-key")
       """
-      
-      # Get API key
-      if api_key is None:
-          api_key = os.getenv("OPENAI_API_KEY")
-          if api_key is None:
-              raise ValueError(
-                  "OpenAI API key not provided. Either pass api_key argument "
-                  "or set OPENAI_API_KEY environment variable."
-              )
-      
-      # Create context and convert to dictionary
-      context = create_player_context(game)
-      context_dict = context.to_dict()
-      
-      # Create the prompt
-      raise_range_info = ""
-      if context_dict['raise_range']:
-          raise_range_info = f"- The raise total must be between {context_dict['raise_range']['min']} and {context_dict['raise_range']['max']}"
-      else:
-          raise_range_info = "- RAISE is not available in this situation"
-      
-      prompt = f"""You are playing Texas Hold'em poker. Here is the current game state:
-
-  {json.dumps(context_dict, indent=2)}
-
-  You must choose one of the available actions: {', '.join(context_dict['available_actions'])}.
-
-  Rules:
-  - If you choose RAISE, you must provide a "total" amount (the total amount to raise to)
-  {raise_range_info}
-  - For other actions (CALL, CHECK, FOLD), do not provide a total value (set it to null)
-  - You have {context_dict['chips']} chips
-  - You need to call {context_dict['chips_to_call']} chips to stay in
-  - The pot is {context_dict['total_pot_size']} chips
-
-  Respond with a JSON object in this exact format:
-  {{"action": "ACTION_NAME", "total": null}}
-
-  For RAISE actions, use:
-  {{"action": "RAISE", "total": <number>}}
 
-  For other actions, use:
-  {{"action": "ACTION_NAME", "total": null}}
+      context, trivial, prompt, api_key = _build_context_and_prompt(
+          game, _TIGHT_PROMPT, api_key, "OPENAI_API_KEY", "OpenAI"
+      )
+      if trivial is not None:
+          return trivial
 
-  Make a good decision as a tight player (playing against a tight player) based on the game situation."""
+      client = _openai_client(api_key)
 
-      # Call OpenAI
-      client = OpenAI(api_key=api_key)
-      
       try:
-          response = client.chat.completions.create(
+          response = client.chat.completions.parse(
               model=model,
               messages=[
-                  {
-                      "role": "system",
-                      "content": "You are a tight poker player making decisions in Texas Hold'em. Your opponent is a tight player. Always respond with valid JSON containing 'action' and 'total' fields."
-                  },
-                  {
-                      "role": "user",
-                      "content": prompt
-                  }
+                  {"role": "system", "content": _TIGHT_SYSTEM},
+                  {"role": "user", "content": prompt},
               ],
               temperature=temperature,
-              response_format={"type": "json_object"}
+              response_format=PokerAction
+          )
+
+          # The schema guarantees the shape, unless the model refused
+          message = response.choices[0].message
+          if message.parsed is None:
+              raise ValueError(f"OpenAI did not return an action: {message.refusal}")
+          return _validate_action(
+              context, message.parsed.action, message.parsed.total, "OpenAI"
           )
-          
-          # Parse the response
-          response_text = response.choices[0].message.content
-          response_json = json.loads(response_text)
-          
-          # Extract action
-          action_str = response_json.get("action", "").upper()
-          total = response_json.get("total")
-          
-          # Convert string to ActionType
-          try:
-              action = ActionType[action_str]
-          except KeyError:
-              raise ValueError(
-                  f"Invalid action '{action_str}' from OpenAI. "
-                  f"Valid actions: {[a.name for a in context.available_actions]}"
-              )
-          
-          # Validate action is available
-          if action not in context.available_actions:
-              raise ValueError(
-                  f"Action '{action_str}' is not available. "
-                  f"Available actions: {[a.name for a in context.available_actions]}"
-              )
-          
-          # Validate raise total if action is RAISE
-          if action == ActionType.RAISE:
-              if total is None:
-                  raise ValueError("RAISE action requires a 'total' value")
-              if context.raise_range and (total < context.raise_range.start or total >= context.raise_range.stop):
-                  raise ValueError(
-                      f"Raise total {total} is out of range. "
-                      f"Valid range: {context.raise_range.start} to {context.raise_range.stop - 1}"
-                  )
-              return action, total
-          else:
-              # For non-raise actions, total should be None
-              return action, None
-              
-      except json.JSONDecodeError as e:
-          raise ValueError(f"Failed to parse OpenAI response as JSON: {e}")
+
       except Exception as e:
           if isinstance(e, ValueError):
               raise
@@ -191,103 +343,31 @@ def gemini_agent(
           >>> game.start_hand()
           >>> action, total = openai_agent(game, api_key="your-api-key")
       """
-      # Get API key
-      if api_key is None:
-          api_key = os.getenv("GEMINI_API_KEY")
-          if api_key is None:
-              raise ValueError(
-                  "Gemini API key not provided. Pass api_key or set GEMINI_API_KEY env var."
-              )
-
-      genai.configure(api_key=api_key)
-
-      # Create context dictionary
-      context = create_player_context(game)
-      context_dict = context.to_dict()
-
-      # Raise info text
-      if context_dict["raise_range"]:
-          raise_range_info = (
-              f"- The raise total must be between "
-              f"{context_dict['raise_range']['min']} "
-              f"and {context_dict['raise_range']['max']}"
-          )
-      else:
-          raise_range_info = "- RAISE is not available in this situation"
-
-      # Prompt
-      prompt = f"""You are playing Texas Hold'em poker. Here is the current game state:
-
-  {json.dumps(context_dict, indent=2)}
 
-  You must choose one of the available actions: {', '.join(context_dict['available_actions'])}.
-
-  Rules:
-  - If you choose RAISE, you must provide a "total" amount (the total amount to raise to)
-  {raise_range_info}
-  - For CALL, CHECK, or FOLD, set total=null
-  - You have {context_dict['chips']} chips
-  - You need to call {context_dict['chips_to_call']} chips
-  - The pot is {context_dict['total_pot_size']} chips
-
-  Respond ONLY with a JSON object:
-  {{"action": "ACTION_NAME", "total": null}}
-  or if raising:
-  {{"action": "RAISE", "total": <number>}}
+      context, trivial, prompt, api_key = _build_context_and_prompt(
+          game, _GEMINI_PROMPT, api_key, "GEMINI_API_KEY", "Gemini"
+      )
+      if trivial is not None:
+          return trivial
 
-  Choose the best action based on your hand, the board, pot odds, and game situation.
-  """
+      # Call Gemini (the model factory has already imported the SDK)
+      model_obj = _gemini_model(api_key, model)
+      import google.generativeai as genai  # pylint: disable=import-outside-toplevel
 
-      # Call Gemini
-      model_obj = genai.GenerativeModel(model)
       response = model_obj.generate_content(
           prompt,
           generation_config=genai.types.GenerationConfig(
               temperature=temperature,
-              response_mime_type="application/json"
+              response_mime_type="application/json",
+              response_schema=PokerAction,
           )
       )
 
       try:
           response_text = response.text
-          response_json = json.loads(response_text)
       except Exception as e:
-          raise ValueError(f"Could not parse Gemini response as JSON: {e}")
-
-      # Extract fields
-      action_str = response_json.get("action", "").upper()
-      total = response_json.get("total")
-
-      # Convert to ActionType
-      try:
-          action = ActionType[action_str]
-      except KeyError:
-          raise ValueError(
-              f"Invalid action '{action_str}' from Gemini. "
-              f"Valid actions: {[a.name for a in context.available_actions]}"
-          )
-
-      # Validate availability
-      if action not in context.available_actions:
-          raise ValueError(
-              f"Action '{action_str}' is not available. "
-              f"Available: {[a.name for a in context.available_actions]}"
-          )
-
-      # Validate total if RAISE
-      if action == ActionType.RAISE:
-          if total is None:
-              raise ValueError("RAISE requires a 'total' value")
-          if context.raise_range and (
-              total < context.raise_range.start or total >= context.raise_range.stop
-          ):
-              raise ValueError(
-                  f"Raise total {total} is out of range. "
-                  f"Valid: {context.raise_range.start} to {context.raise_range.stop - 1}"
-              )
-          return action, total
-
-      return action, None
+          raise ValueError(f"Could not read Gemini response: {e}")
+      return _parse_and_validate(response_text, context, "Gemini")
 
 def claude_agent(
     game: TexasHoldEm,
@@ -321,121 +401,36 @@ def claude_agent(
           >>> action, total = openai_agent(game, api_key="your-api-key")
       """
 
-      # API key
-      if api_key is None:
-          api_key = os.getenv("ANTHROPIC_API_KEY")
-          if api_key is None:
-              raise ValueError(
-                  "Anthropic API key not provided. Either pass api_key argument "
-                  "or set ANTHROPIC_API_KEY environment variable."
-              )
-
-      # Create context dictionary
-      context = create_player_context(game)
-      context_dict = context.to_dict()
-
-      # Raise range info
-      if context_dict['raise_range']:
-          raise_range_info = (
-              f"- The raise total must be between "
-              f"{context_dict['raise_range']['min']} and {context_dict['raise_range']['max']}"
-          )
-      else:
-          raise_range_info = "- RAISE is not available in this situation"
-
-      # *** IDENTICAL PROMPT TO GPT VERSION ***
-      prompt = f"""You are playing Texas Hold'em poker. Here is the current game state:
-
-    {json.dumps(context_dict, indent=2)}
-
-    You must choose one of the available actions: {', '.join(context_dict['available_actions'])}.
-
-    Rules:
-    - If you choose RAISE, you must provide a "total" amount (the total amount to raise to)
-    {raise_range_info}
-    - For other actions (CALL, CHECK, FOLD), do not provide a total value (set it to null)
-    - You have {context_dict['chips']} chips
-    - You need to call {context_dict['chips_to_call']} chips to stay in
-    - The pot is {context_dict['total_pot_size']} chips
-
-    Respond with a JSON object in this exact format:
-    {{"action": "ACTION_NAME", "total": null}}
-
-    For RAISE actions, use:
-    {{"action": "RAISE", "total": <number>}}
-
-    For other actions, use:
-    {{"action": "ACTION_NAME", "total": null}}
-
-    Make a good decision as a tight player (playing against a tight player) based on the game situation."""
+      # Same prompt as the OpenAI agent
+      context, trivial, prompt, api_key = _build_context_and_prompt(
+          game, _TIGHT_PROMPT, api_key, "ANTHROPIC_API_KEY", "Anthropic"
+      )
+      if trivial is not None:
+          return trivial
 
-      # Claude call
-      client = Anthropic(api_key=api_key)
+      client = _anthropic_client(api_key)
 
       try:
           response = client.messages.create(
               model=model,
               max_tokens=200,
               temperature=temperature,
-              system="You are a tight poker player making decisions in Texas Hold'em. Your opponent is a tight player. Always respond with valid JSON containing 'action' and 'total' fields.",
+              system=_TIGHT_SYSTEM,
               messages=[
                   {
                       "role": "user",
                       "content": prompt +
                       "\n\nREPEAT: Output ONLY raw JSON, no codeblocks, no text. "
                       "Example valid output:\n"
-                      '{ "action": "CALL", "total": null }'
+                      '{"action":"CALL","total":null}'
                   }
               ]
           )
 
           # Claude returns a list of content blocks
-          response_text = response.content[0].text.strip()
-
-          # Parse JSON
-          response_json = json.loads(response_text)
-
-          action_str = response_json.get("action", "").upper()
-          total = response_json.get("total")
-
-          # Convert to ActionType enum
-          try:
-              action = ActionType[action_str]
-          except KeyError:
-              raise ValueError(
-                  f"Invalid action '{action_str}' from Claude. "
-                  f"Valid actions: {[a.name for a in context.available_actions]}"
-              )
-
-          # Validate available action
-          if action not in context.available_actions:
-              raise ValueError(
-                  f"Action '{action_str}' is not available. "
-                  f"Available actions: {[a.name for a in context.available_actions]}"
-              )
-
-          # Validate raise totals
-          if action == ActionType.RAISE:
-              if total is None:
-                  raise ValueError("RAISE action requires a 'total' value")
-
-              if context.raise_range and (
-                  total < context.raise_range.start or total >= context.raise_range.stop
-              ):
-                  raise ValueError(
-                      f"Raise total {total} is out of range. "
-                      f"Valid range: {context.raise_range.start} to {context.raise_range.stop - 1}"
-                  )
-
-              return action, total
-
-          else:
-              return action, None
-
-      except json.JSONDecodeError as e:
-          raise ValueError(f"Failed to parse Claude response as JSON: {e}")
+          return _parse_and_validate(response.content[0].text.strip(), context, "Claude")
 
       except Exception as e:
           if isinstance(e, ValueError):
               raise
-          raise ValueError(f"Error calling Anthropic API: {e}")
\ No newline at end of file
+          raise ValueError(f"Error calling Anthropic API: {e}")
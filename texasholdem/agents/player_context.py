@@ -6,7 +6,8 @@ information a player needs to make a decision in Texas Hold'em.
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from functools import cached_property
+from typing import List, Dict, Optional, Tuple
 
 from texasholdem.game.game import TexasHoldEm
 from texasholdem.game.action_type import ActionType
@@ -15,6 +16,13 @@ from texasholdem.game.hand_phase import HandPhase
 from texasholdem.card.card import Card
 
 
+# Lookup tables over the 52 cards so to_dict does not re-format card strings
+# and re-parse their ranks on every agent turn
+_CARDS = [Card(rank + suit) for rank in Card.STR_RANKS for suit in "shdc"]
+_CARD_STR: Dict[int, str] = {int(card): str(card) for card in _CARDS}
+_CARD_RANK: Dict[int, int] = {int(card): card.rank for card in _CARDS}
+
+
 @dataclass
 class PlayerContext:
     """
@@ -46,16 +54,26 @@ class PlayerContext:
     # Available moves
     available_actions: List[ActionType]
     raise_range: Optional[range] = None
+
+    @cached_property
+    def available_action_names(self) -> Tuple[str, ...]:
+        """Names of the available actions, computed once per context."""
+        return tuple(action.name for action in self.available_actions)
     
     def to_dict(self) -> Dict:
         """
         Convert the context to a dictionary for easy serialization.
         Useful for passing to LLMs or logging.
         """
-        RANK_ORDER = "23456789TJQKA"
-        rank_value = {r: i for i, r in enumerate(RANK_ORDER)}
-        sorted_cards = sorted(self.hand, key=lambda c: rank_value[str(c)[0]], reverse=True)
-        card_strings = [str(card) for card in sorted_cards]
+        if len(self.hand) == 2:
+            # Hold'em hands: one rank comparison instead of a keyed sort
+            high, low = self.hand
+            if _CARD_RANK[low] > _CARD_RANK[high]:
+                high, low = low, high
+            card_strings = [_CARD_STR[high], _CARD_STR[low]]
+        else:
+            sorted_cards = sorted(self.hand, key=_CARD_RANK.__getitem__, reverse=True)
+            card_strings = [_CARD_STR[card] for card in sorted_cards]
 
         return {
             "player_id": self.player_id,
@@ -63,7 +81,7 @@ class PlayerContext:
             "chips": self.chips,
             "chips_to_call": self.chips_to_call,
             "hand_phase": self.hand_phase.name,
-            "board_cards": [str(card) for card in self.board_cards],
+            "board_cards": [_CARD_STR[card] for card in self.board_cards],
             "total_pot_size": self.total_pot_size,
             "min_raise_amount": self.min_raise_amount,
             "other_players": {
@@ -73,7 +91,7 @@ class PlayerContext:
                 }
                 for pid, chips in self.other_players_chips.items()
             },
-            "available_actions": [action.name for action in self.available_actions],
+            "available_actions": list(self.available_action_names),
             "raise_range": (
                 {"min": self.raise_range.start, "max": self.raise_range.stop - 1}
                 if self.raise_range else None
@@ -96,25 +114,26 @@ def create_player_context(game: TexasHoldEm, player_id: Optional[int] = None) ->
     if player_id is None:
         player_id = game.current_player
     
-    current_player = game.players[player_id]
+    players = game.players
+    current_player = players[player_id]
     
-    # Calculate total pot size
-    total_pot = sum(pot.get_total_amount() for pot in game.pots)
+    # Calculate total pot size (Pot.get_total_amount, read off the fields directly)
+    total_pot = sum(pot.amount + sum(pot.player_amounts.values()) for pot in game.pots)
     
-    # Get other players info
+    # Get other players info in one pass
     other_players_chips = {}
     other_players_states = {}
     for pid in range(game.max_players):
         if pid != player_id:
-            other_players_chips[pid] = game.players[pid].chips
-            other_players_states[pid] = game.players[pid].state
+            player = players[pid]
+            other_players_chips[pid] = player.chips
+            other_players_states[pid] = player.state
     
     # Get available moves
     available_moves = game.get_available_moves()
     available_actions = available_moves.action_types
     raise_range = available_moves.raise_range if available_moves.raise_range else None
     
-    hand=game.get_hand(player_id)
     # Create context
     context = PlayerContext(
         player_id=player_id,
@@ -132,3 +151,27 @@ def create_player_context(game: TexasHoldEm, player_id: Optional[int] = None) ->
     )
     
     return context
+
+
+def _trivial_action(context: PlayerContext) -> Optional[Tuple[ActionType, Optional[int]]]:
+    """
+    The action to take without consulting a decision-maker, if the choice is forced.
+
+    That is when only one non-raise action is available, or when the only
+    alternative to a free check is folding.
+    
+    Arguments:
+        context (PlayerContext): The context of the player to act
+    
+    Returns:
+        Optional[Tuple[ActionType, Optional[int]]]: The forced action tuple, or
+            None if there is a real decision to make
+    """
+    actions = context.available_actions
+    if len(actions) == 1 and actions[0] != ActionType.RAISE:
+        return actions[0], None
+    if ActionType.CHECK in actions and all(
+        action in (ActionType.CHECK, ActionType.FOLD) for action in actions
+    ):
+        return ActionType.CHECK, None
+    return None
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import math
-from typing import Union, Iterable, List
+from typing import Dict, Union, Iterable, List
+
+# card int -> string, filled in by Card.__str__ (there are only 52 entries)
+_CARD_STRINGS: Dict[int, str] = {}
 
 
 class Card(int):
@@ -137,7 +140,11 @@ class Card(int):
             str: The human-readable string representing this card.
 
         """
-        return Card.STR_RANKS[self.rank] + Card.INT_SUIT_TO_CHAR_SUIT[self.suit]
+        string = _CARD_STRINGS.get(self)
+        if string is None:
+            string = Card.STR_RANKS[self.rank] + Card.INT_SUIT_TO_CHAR_SUIT[self.suit]
+            _CARD_STRINGS[self] = string
+        return string
 
     def __repr__(self) -> str:
         return f'Card("{str(self)}")'
@@ -1245,15 +1245,20 @@ class TexasHoldEm:
         deck = Deck()
         deck.cards = list(history.settle.new_cards)
 
-        # player actions in a stack
-        player_actions: List[Tuple[int, ActionType, Optional[int]]] = []
+        # stack the new cards of each round on top of the settle cards
         for bet_round in (history.river, history.turn, history.flop, history.preflop):
             if bet_round:
                 deck.cards = bet_round.new_cards + deck.cards
-                for action in reversed(bet_round.actions):
-                    player_actions.insert(
-                        0, (action.player_id, action.action_type, action.total)
-                    )
+
+        # player actions in order, consumed front to back
+        player_actions: List[Tuple[int, ActionType, Optional[int]]] = []
+        for bet_round in (history.preflop, history.flop, history.turn, history.river):
+            if bet_round:
+                player_actions.extend(
+                    (action.player_id, action.action_type, action.total)
+                    for action in bet_round.actions
+                )
+        action_iter = iter(player_actions)
 
         # start hand (deck will deal)
         game.start_hand()
@@ -1269,8 +1274,8 @@ class TexasHoldEm:
             yield game
 
             try:
-                player_id, action, total = player_actions.pop(0)
-            except IndexError as err:
+                player_id, action, total = next(action_iter)
+            except StopIteration as err:
                 raise HistoryImportError(
                     "Expected more actions than given in the history file."
                 ) from err